@@ -1,9 +1,16 @@
-import pandas as pd
 import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import io
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+import datasets_cache
+
 # Define expected schemas based on the PDF documentation
 SCHEMAS = {
     "db_company_intent_geo_weekly_file_sample.csv": {
@@ -59,162 +66,238 @@ SCHEMAS = {
     "db1_keyword_set_keywords_file_sample.csv": {"keyword_set_id": "int64"},
 }
 
+# Low-cardinality text columns, loaded as categoricals (integer codes into a
+# small dictionary) instead of one string per row
+CATEGORICAL_COLUMNS = {
+    "intent_strength",
+    "country",
+    "census_division",
+    "duration_type",
+    "keyword_set",
+}
 
-def analyze_csv_files(directory="../private/data/raw"):
-    results = []
+# Key columns whose distinct values are counted, and the stat they report as
+UNIQUE_COLUMNS = {
+    "company_id": "unique_companies",
+    "employment_id": "unique_contacts",
+    "keyword": "unique_keywords",
+}
 
-    # Get all CSV files
-    csv_files = sorted(Path(directory).glob("*.csv"))
 
-    for csv_file in csv_files:
-        print(f"Analyzing {csv_file.name}...")
-
-        # Read CSV
-        df = pd.read_csv(csv_file)
-
-        # Basic stats
-        stats = {
-            "file": csv_file.name,
-            "rows": len(df),
-            "columns": len(df.columns),
-            "file_size_mb": round(csv_file.stat().st_size / (1024 * 1024), 2),
-            "memory_usage_mb": round(
-                df.memory_usage(deep=True).sum() / (1024 * 1024), 2
-            ),
-        }
-
-        # Null analysis
-        null_counts = df.isnull().sum()
-        stats["total_nulls"] = null_counts.sum()
-        stats["columns_with_nulls"] = (null_counts > 0).sum()
-        stats["null_percentage"] = round(
-            (stats["total_nulls"] / (stats["rows"] * stats["columns"]) * 100), 2
-        )
+def arrow_dtype_name(arrow_type):
+    """Map an Arrow column type onto the pandas dtype names used in SCHEMAS"""
+    if pa.types.is_dictionary(arrow_type):
+        return "category"
+    if pa.types.is_boolean(arrow_type):
+        return "bool"
+    if pa.types.is_integer(arrow_type):
+        return "int64"
+    if pa.types.is_floating(arrow_type) or pa.types.is_null(arrow_type):
+        return "float64"
+    if pa.types.is_temporal(arrow_type):
+        return "datetime64[ns]"
+    return "object"
 
-        # Data type mismatches
-        mismatches = []
-        if csv_file.name in SCHEMAS:
-            schema = SCHEMAS[csv_file.name]
-            for col, expected_type in schema.items():
-                if col in df.columns:
-                    actual_type = str(df[col].dtype)
-                    if expected_type == "bool" and actual_type not in [
-                        "bool",
-                        "boolean",
-                    ]:
-                        mismatches.append(f"{col}: expected bool, got {actual_type}")
-                    elif (
-                        expected_type in ["int64", "float64"]
-                        and "object" in actual_type
-                    ):
-                        mismatches.append(f"{col}: expected numeric, got {actual_type}")
-
-        stats["type_mismatches"] = len(mismatches)
-        stats["mismatch_details"] = ", ".join(mismatches[:3]) + (
-            "..." if len(mismatches) > 3 else ""
-        )
 
-        # Unique value analysis for key columns
-        if "company_id" in df.columns:
-            stats["unique_companies"] = df["company_id"].nunique()
-        if "employment_id" in df.columns:
-            stats["unique_contacts"] = df["employment_id"].nunique()
-        if "keyword" in df.columns:
-            stats["unique_keywords"] = df["keyword"].nunique()
-
-        # Date range for temporal data
-        date_cols = [
-            col
-            for col in df.columns
-            if "date" in col.lower() and col != "partition_date"
+def analyze_csv_file(csv_file):
+    """Profile a single CSV file"""
+    print(f"Analyzing {csv_file.name}...")
+
+    # Load from the Parquet cache into Arrow; null counts and per-column
+    # stats are computed on Arrow buffers instead of pandas object columns
+    lf = datasets_cache.get(csv_file)
+    schema = lf.collect_schema()
+    categorical_cols = [
+        col
+        for col, dtype in schema.items()
+        if col in CATEGORICAL_COLUMNS and dtype == pl.String
+    ]
+    unique_cols = [col for col in UNIQUE_COLUMNS if col in schema]
+
+    # Distinct counts for all key columns come from one select, collected
+    # alongside the table so both share the scan
+    table, uniques = pl.collect_all(
+        [
+            lf.with_columns(pl.col(categorical_cols).cast(pl.Categorical)),
+            lf.select(pl.col(unique_cols).drop_nulls().n_unique()),
         ]
-        if date_cols:
-            try:
-                date_col = date_cols[0]
-                df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-                stats["date_range"] = f"{df[date_col].min()} to {df[date_col].max()}"
-            except:
-                pass
+    )
+    table = table.to_arrow()
+
+    # Basic stats; memory is the size of the table's buffers, read from
+    # buffer metadata rather than by walking the values
+    stats = {
+        "file": csv_file.name,
+        "rows": table.num_rows,
+        "columns": table.num_columns,
+        "file_size_mb": round(csv_file.stat().st_size / (1024 * 1024), 2),
+        "memory_usage_mb": round(table.get_total_buffer_size() / (1024 * 1024), 2),
+    }
+
+    # Null analysis (Arrow keeps null_count as per-chunk metadata)
+    null_counts = [column.null_count for column in table.columns]
+    stats["total_nulls"] = sum(null_counts)
+    stats["columns_with_nulls"] = sum(1 for n in null_counts if n > 0)
+    total_cells = stats["rows"] * stats["columns"]
+    stats["null_percentage"] = (
+        round((stats["total_nulls"] / total_cells * 100), 2) if total_cells > 0 else 0
+    )
+
+    # Data type mismatches
+    mismatches = []
+    if csv_file.name in SCHEMAS:
+        schema = SCHEMAS[csv_file.name]
+        for col, expected_type in schema.items():
+            if col in table.column_names:
+                actual_type = arrow_dtype_name(table.schema.field(col).type)
+                if expected_type == "bool" and actual_type not in [
+                    "bool",
+                    "boolean",
+                ]:
+                    mismatches.append(f"{col}: expected bool, got {actual_type}")
+                elif expected_type in ["int64", "float64"] and "object" in actual_type:
+                    mismatches.append(f"{col}: expected numeric, got {actual_type}")
+
+    stats["type_mismatches"] = len(mismatches)
+    stats["mismatch_details"] = ", ".join(mismatches[:3]) + (
+        "..." if len(mismatches) > 3 else ""
+    )
+
+    # Unique value analysis for key columns
+    for col in uniques.columns:
+        stats[UNIQUE_COLUMNS[col]] = uniques[col].item()
+
+    # Date range for temporal data
+    date_cols = [
+        col
+        for col in table.column_names
+        if "date" in col.lower() and col != "partition_date"
+    ]
+    if date_cols:
+        try:
+            date_col = date_cols[0]
+            # Parse and reduce in Arrow kernels; unparseable values become
+            # nulls, like pd.to_datetime(errors="coerce")
+            dates = pc.strptime(
+                table[date_col], format="%Y-%m-%d", unit="s", error_is_null=True
+            )
+            date_range = pc.min_max(dates).as_py()
+            stats["date_range"] = f"{date_range['min']} to {date_range['max']}"
+        except:
+            pass
+
+    return stats
+
+
+def analyze_csv_files(directory="../private/data/raw"):
+    # Get all CSV files
+    csv_files = sorted(Path(directory).glob("*.csv"))
 
-        results.append(stats)
+    # Files are independent, so profile them in parallel; spawn keeps the
+    # workers clear of the parent's Polars/Arrow thread pools. Each worker
+    # holds one collected table, so workers are capped at the file count
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(len(csv_files), cpu_count))
+
+    # Split the cores between workers instead of giving every worker's
+    # Polars pool one thread per core. Polars reads this when it is
+    # imported, so it has to be in the environment the workers spawn with
+    polars_threads = os.environ.get("POLARS_MAX_THREADS")
+    os.environ["POLARS_MAX_THREADS"] = str(max(1, cpu_count // workers))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            results = list(executor.map(analyze_csv_file, csv_files))
+    finally:
+        if polars_threads is None:
+            del os.environ["POLARS_MAX_THREADS"]
+        else:
+            os.environ["POLARS_MAX_THREADS"] = polars_threads
 
     return results
 
 
-def generate_markdown_report(results, output_file="../data_summary.md"):
-    with open(output_file, "w") as f:
-        f.write("# Dataset Summary Statistics\n\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+def render_markdown_report(results):
+    """Build the markdown summary report as a single string"""
+    buf = io.StringIO()
+    buf.write("# Dataset Summary Statistics\n\n")
+    buf.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
 
-        # Overview table
-        f.write("## Overview\n\n")
-        f.write(
-            "| File | Rows | Columns | File Size (MB) | Memory (MB) | Nulls (%) | Type Issues |\n"
-        )
-        f.write(
-            "|------|------|---------|----------------|-------------|-----------|-------------|\n"
+    # Overview table
+    buf.write("## Overview\n\n")
+    buf.write(
+        "| File | Rows | Columns | File Size (MB) | Memory (MB) | Nulls (%) | Type Issues |\n"
+    )
+    buf.write(
+        "|------|------|---------|----------------|-------------|-----------|-------------|\n"
+    )
+
+    for r in results:
+        buf.write(
+            f"| {r['file']} | {r['rows']:,} | {r['columns']} | {r['file_size_mb']} | {r['memory_usage_mb']} | {r['null_percentage']}% | {r['type_mismatches']} |\n"
         )
 
-        for r in results:
-            f.write(
-                f"| {r['file']} | {r['rows']:,} | {r['columns']} | {r['file_size_mb']} | {r['memory_usage_mb']} | {r['null_percentage']}% | {r['type_mismatches']} |\n"
+    # Detailed findings
+    buf.write("\n## Key Findings\n\n")
+
+    # Data coverage
+    buf.write("### Data Coverage\n\n")
+    for r in results:
+        if "unique_companies" in r:
+            buf.write(
+                f"- **{r['file']}**: {r['unique_companies']:,} unique companies\n"
             )
+        if "unique_contacts" in r:
+            buf.write(f"- **{r['file']}**: {r['unique_contacts']:,} unique contacts\n")
+        if "unique_keywords" in r:
+            buf.write(f"- **{r['file']}**: {r['unique_keywords']:,} unique keywords\n")
 
-        # Detailed findings
-        f.write("\n## Key Findings\n\n")
-
-        # Data coverage
-        f.write("### Data Coverage\n\n")
-        for r in results:
-            if "unique_companies" in r:
-                f.write(
-                    f"- **{r['file']}**: {r['unique_companies']:,} unique companies\n"
-                )
-            if "unique_contacts" in r:
-                f.write(
-                    f"- **{r['file']}**: {r['unique_contacts']:,} unique contacts\n"
-                )
-            if "unique_keywords" in r:
-                f.write(
-                    f"- **{r['file']}**: {r['unique_keywords']:,} unique keywords\n"
-                )
-
-        # Data quality issues
-        f.write("\n### Data Quality Issues\n\n")
-        issues_found = False
-        for r in results:
-            if r["type_mismatches"] > 0:
-                f.write(
-                    f"- **{r['file']}** has type mismatches: {r['mismatch_details']}\n"
-                )
-                issues_found = True
-            if r["null_percentage"] > 10:
-                f.write(
-                    f"- **{r['file']}** has high null rate: {r['null_percentage']}%\n"
-                )
-                issues_found = True
-
-        if not issues_found:
-            f.write("- No significant data quality issues detected\n")
-
-        # Temporal coverage
-        f.write("\n### Temporal Coverage\n\n")
-        for r in results:
-            if "date_range" in r:
-                f.write(f"- **{r['file']}**: {r['date_range']}\n")
-
-        # Summary stats
-        f.write("\n## Summary Statistics\n\n")
-        total_rows = sum(r["rows"] for r in results)
-        total_size = sum(r["file_size_mb"] for r in results)
-        f.write(f"- Total rows across all files: {total_rows:,}\n")
-        f.write(f"- Total file size: {total_size:.1f} MB\n")
-        f.write(
-            f"- Average null rate: {np.mean([r['null_percentage'] for r in results]):.1f}%\n"
-        )
+    # Data quality issues
+    buf.write("\n### Data Quality Issues\n\n")
+    issues_found = False
+    for r in results:
+        if r["type_mismatches"] > 0:
+            buf.write(
+                f"- **{r['file']}** has type mismatches: {r['mismatch_details']}\n"
+            )
+            issues_found = True
+        if r["null_percentage"] > 10:
+            buf.write(
+                f"- **{r['file']}** has high null rate: {r['null_percentage']}%\n"
+            )
+            issues_found = True
+
+    if not issues_found:
+        buf.write("- No significant data quality issues detected\n")
+
+    # Temporal coverage
+    buf.write("\n### Temporal Coverage\n\n")
+    for r in results:
+        if "date_range" in r:
+            buf.write(f"- **{r['file']}**: {r['date_range']}\n")
+
+    # Summary stats
+    buf.write("\n## Summary Statistics\n\n")
+    total_rows = sum(r["rows"] for r in results)
+    total_size = sum(r["file_size_mb"] for r in results)
+    buf.write(f"- Total rows across all files: {total_rows:,}\n")
+    buf.write(f"- Total file size: {total_size:.1f} MB\n")
+    buf.write(
+        f"- Average null rate: {np.mean([r['null_percentage'] for r in results]):.1f}%\n"
+    )
+
+    return buf.getvalue()
+
+
+def generate_markdown_report(results, output_file="../data_summary.md"):
+    report = render_markdown_report(results)
+    with open(output_file, "w") as f:
+        f.write(report)
 
 
 if __name__ == "__main__":
     results = analyze_csv_files()
     generate_markdown_report(results)
-    print("\nReport generated: ../data_summary.md")
\ No newline at end of file
+    print("\nReport generated: ../data_summary.md")
@@ -0,0 +1,98 @@
+"""
+Dataset Cache for Intent Files
+Parses each CSV once into a Parquet copy and serves lazy frames from it
+"""
+
+import hashlib
+from pathlib import Path
+
+import polars as pl
+
+CACHE_DIR = Path("../private/data/cache")
+
+# Same markers pandas.read_csv treats as missing by default
+NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+_frames = {}
+
+
+def cache_path(csv_path):
+    """Parquet cache location for a CSV, keyed on its path, size and mtime"""
+    csv_path = Path(csv_path).resolve()
+    stat = csv_path.stat()
+    key = hashlib.blake2b(
+        f"{csv_path}:{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=8
+    ).hexdigest()
+    return CACHE_DIR / f"{csv_path.stem}-{key}.parquet"
+
+
+def build_cache(csv_path, parquet_path):
+    """Parse a CSV into its Parquet cache, replacing stale copies"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    for stale in CACHE_DIR.glob(f"{Path(csv_path).stem}-{'?' * 16}.parquet"):
+        stale.unlink()
+
+    # Stream the CSV through Polars' multithreaded reader straight into
+    # Parquet so peak memory stays bounded regardless of file size; write
+    # under a temporary name so readers never see a partial file
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    pl.scan_csv(
+        csv_path, infer_schema_length=None, null_values=NULL_VALUES
+    ).sink_parquet(tmp_path, engine="streaming")
+
+    # Columns without a single value are inferred as strings; keep them untyped
+    lf = pl.scan_parquet(tmp_path)
+    stats = lf.select(pl.len().alias("_rows"), pl.all().null_count()).collect()
+    rows = stats["_rows"].item()
+    empty_cols = [
+        col for col in lf.collect_schema() if rows > 0 and stats[col].item() == rows
+    ]
+
+    if empty_cols:
+        lf.with_columns(pl.col(empty_cols).cast(pl.Null)).sink_parquet(
+            parquet_path, engine="streaming"
+        )
+        tmp_path.unlink()
+    else:
+        tmp_path.replace(parquet_path)
+
+
+def ensure_cache(csv_path):
+    """Path to the Parquet cache for a CSV, building it on first access"""
+    parquet_path = cache_path(csv_path)
+
+    if not parquet_path.exists():
+        build_cache(csv_path, parquet_path)
+
+    return parquet_path
+
+
+def get(csv_path):
+    """Lazy frame for a CSV, built from the Parquet cache"""
+    parquet_path = ensure_cache(csv_path)
+
+    if parquet_path not in _frames:
+        _frames[parquet_path] = pl.scan_parquet(parquet_path)
+
+    return _frames[parquet_path]
@@ -5,14 +5,19 @@ Analyzes foreign key relationships and data integrity across CSV files
 """
 
 import pandas as pd
+import polars as pl
+import csv
 import os
 from pathlib import Path
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import datasets_cache
 
 
 def load_datasets(data_dir="../private/data/raw"):
-    """Load all CSV files from the datasets directory"""
+    """Load all CSV files from the datasets directory as cached lazy frames"""
     datasets = {}
     data_path = Path(data_dir)
 
@@ -25,17 +30,45 @@ def load_datasets(data_dir="../private/data/raw"):
 
     print(f"Loading {len(csv_files)} CSV files...")
 
-    for file_path in csv_files:
+    # Cache misses parse in Polars, which releases the GIL, so files can be
+    # prepared on threads while the frames stay in this process
+    with ThreadPoolExecutor() as executor:
+        futures = {
+            file_path: executor.submit(datasets_cache.get, file_path)
+            for file_path in csv_files
+        }
+
+    for file_path, future in futures.items():
         try:
-            df = pd.read_csv(file_path, low_memory=False)
-            datasets[file_path.name] = df
-            print(f"  {file_path.name}: {len(df):,} rows, {len(df.columns)} columns")
+            datasets[file_path.name] = future.result()
         except Exception as e:
             print(f"  ERROR loading {file_path.name}: {e}")
 
+    row_counts = count_rows(datasets)
+    for filename, lf in datasets.items():
+        print(
+            f"  {filename}: {row_counts[filename]:,} rows, {lf.collect_schema().len()} columns"
+        )
+
     return datasets
 
 
+def count_rows(datasets):
+    """Count rows of every lazy dataset in a single parallel collect"""
+    filenames = list(datasets)
+    counts = pl.collect_all([datasets[name].select(pl.len()) for name in filenames])
+    return {name: count.item() for name, count in zip(filenames, counts)}
+
+
+def join_key_dtype(parent_dtype, child_dtype):
+    """Pick a common dtype for joining a child key against its parent key"""
+    if parent_dtype == child_dtype:
+        return parent_dtype
+    if parent_dtype.is_numeric() and child_dtype.is_numeric():
+        return pl.Float64
+    return pl.String
+
+
 def analyze_foreign_keys(datasets):
     """Analyze foreign key relationships between datasets"""
 
@@ -129,28 +162,74 @@ def analyze_foreign_keys(datasets):
         ),
     ]
 
-    results = []
+    checked = []
+    queries = []
+    parent_uniques = {}
 
     for parent_table, parent_key, child_table, child_key in relationships:
         if parent_table not in datasets or child_table not in datasets:
             continue
 
-        parent_df = datasets[parent_table]
-        child_df = datasets[child_table]
+        parent_schema = datasets[parent_table].collect_schema()
+        child_schema = datasets[child_table].collect_schema()
 
         # Skip if columns don't exist
-        if parent_key not in parent_df.columns or child_key not in child_df.columns:
+        if parent_key not in parent_schema or child_key not in child_schema:
             continue
 
-        # Get unique values, excluding nulls
-        parent_values = set(parent_df[parent_key].dropna().astype(str))
-        child_values = set(child_df[child_key].dropna().astype(str))
+        # Unique parent values, excluding nulls; shared by every relationship
+        # that references the same parent key
+        if (parent_table, parent_key) not in parent_uniques:
+            parent_uniques[(parent_table, parent_key)] = (
+                datasets[parent_table].select(parent_key).drop_nulls().unique()
+            )
+        parent_unique = parent_uniques[(parent_table, parent_key)]
+
+        key_dtype = join_key_dtype(parent_schema[parent_key], child_schema[child_key])
+        child_refs = datasets[child_table].select(pl.col(child_key).cast(key_dtype))
+
+        # Valid references are the child rows kept by a semi join on the
+        # native key dtype, so no joined columns are materialized. Null keys
+        # never match and count() skips them, so nulls need no filter pass
+        valid_refs = child_refs.join(
+            parent_unique.with_columns(pl.col(parent_key).cast(key_dtype)),
+            left_on=child_key,
+            right_on=parent_key,
+            how="semi",
+        )
+        queries.append(
+            pl.concat(
+                [
+                    child_refs.select(pl.col(child_key).count().alias("total")),
+                    valid_refs.select(pl.len().alias("valid")),
+                ],
+                how="horizontal",
+            )
+        )
+        checked.append((parent_table, parent_key, child_table, child_key))
+
+    # Unique parent counts are computed once per parent key, not per
+    # relationship
+    parent_keys = list(parent_uniques)
+    queries += [parent_uniques[key].select(pl.len()) for key in parent_keys]
+
+    # Collect every relationship at once so shared scans are planned together
+    frames = pl.collect_all(queries, engine="streaming")
+    parent_unique_counts = {
+        key: frame.item() for key, frame in zip(parent_keys, frames[len(checked) :])
+    }
+
+    results = []
+
+    for (parent_table, parent_key, child_table, child_key), frame in zip(
+        checked, frames
+    ):
+        counts = frame.row(0, named=True)
 
         # Calculate relationship metrics
-        total_child_refs = len(child_df[child_df[child_key].notna()])
-        valid_refs = len(
-            [v for v in child_df[child_key].dropna().astype(str) if v in parent_values]
-        )
+        parent_unique_values = parent_unique_counts[(parent_table, parent_key)]
+        total_child_refs = counts["total"]
+        valid_refs = counts["valid"]
         invalid_refs = total_child_refs - valid_refs
 
         referential_integrity = (
@@ -163,7 +242,7 @@ def analyze_foreign_keys(datasets):
                 "parent_key": parent_key,
                 "child_table": child_table,
                 "child_key": child_key,
-                "parent_unique_values": len(parent_values),
+                "parent_unique_values": parent_unique_values,
                 "child_total_refs": total_child_refs,
                 "valid_refs": valid_refs,
                 "invalid_refs": invalid_refs,
@@ -177,27 +256,74 @@ def analyze_foreign_keys(datasets):
     return results
 
 
-def analyze_data_coverage(datasets):
-    """Analyze data coverage and quality metrics"""
+def pandas_dtype_name(dtype, has_nulls):
+    """Map a Polars dtype onto the pandas dtype name pd.read_csv would give"""
+    if dtype == pl.Boolean:
+        return "object" if has_nulls else "bool"
+    if dtype.is_integer():
+        return "float64" if has_nulls else "int64"
+    if dtype.is_float() or dtype == pl.Null:
+        return "float64"
+    if dtype.is_temporal():
+        return "datetime64[ns]"
+    if dtype == pl.Categorical:
+        return "category"
+    return "object"
+
+
+COVERAGE_FIELDS = [
+    "table",
+    "column",
+    "total_rows",
+    "null_count",
+    "null_percentage",
+    "unique_values",
+    "data_type",
+]
+
+
+def analyze_data_coverage(datasets, output_dir):
+    """Analyze data coverage and quality metrics, streaming rows to CSV"""
     coverage = []
 
-    for filename, df in datasets.items():
-        for col in df.columns:
-            null_count = df[col].isnull().sum()
-            null_pct = (null_count / len(df)) * 100
-            unique_count = df[col].nunique()
+    filenames = list(datasets)
+
+    # Null and unique counts for every column in a single scan per file,
+    # with all files collected in parallel
+    queries = [
+        datasets[filename].select(
+            pl.len().alias("_total_rows"),
+            pl.all().null_count().name.suffix("_nulls"),
+            pl.all().drop_nulls().n_unique().name.suffix("_uniq"),
+        )
+        for filename in filenames
+    ]
+    frames = pl.collect_all(queries)
 
-            coverage.append(
-                {
+    with open(output_dir / "data_coverage_analysis.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COVERAGE_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+        for filename, frame in zip(filenames, frames):
+            schema = datasets[filename].collect_schema()
+            stats = frame.row(0, named=True)
+            total_rows = stats["_total_rows"]
+
+            for col, dtype in schema.items():
+                null_count = stats[f"{col}_nulls"]
+                null_pct = (null_count / total_rows * 100) if total_rows > 0 else 0
+
+                row = {
                     "table": filename,
                     "column": col,
-                    "total_rows": len(df),
+                    "total_rows": total_rows,
                     "null_count": null_count,
                     "null_percentage": round(null_pct, 2),
-                    "unique_values": unique_count,
-                    "data_type": str(df[col].dtype),
+                    "unique_values": stats[f"{col}_uniq"],
+                    "data_type": pandas_dtype_name(dtype, null_count > 0),
                 }
-            )
+                writer.writerow(row)
+                coverage.append(row)
 
     return coverage
 
@@ -211,12 +337,15 @@ def generate_report(datasets, fk_results, coverage_results):
 
     # Dataset summary
     print(f"\nDATASET SUMMARY:")
-    total_rows = sum(len(df) for df in datasets.values())
+    row_counts = count_rows(datasets)
+    total_rows = sum(row_counts.values())
     print(f"Total files: {len(datasets)}")
     print(f"Total rows: {total_rows:,}")
 
-    for filename, df in datasets.items():
-        print(f"  {filename}: {len(df):,} rows × {len(df.columns)} columns")
+    for filename, lf in datasets.items():
+        print(
+            f"  {filename}: {row_counts[filename]:,} rows × {lf.collect_schema().len()} columns"
+        )
 
     # Foreign key analysis
     print(f"\nFOREIGN KEY RELATIONSHIP ANALYSIS:")
@@ -286,17 +415,13 @@ def setup_output_directory():
     return output_dir
 
 
-def save_detailed_results(fk_results, coverage_results, output_dir):
+def save_detailed_results(fk_results, output_dir):
     """Save detailed results to CSV files in output directory"""
 
-    # Save foreign key analysis
+    # Save foreign key analysis; data coverage is written while it is analyzed
     fk_df = pd.DataFrame(fk_results)
     fk_df.to_csv(output_dir / "relationship_analysis.csv", index=False)
 
-    # Save data coverage
-    coverage_df = pd.DataFrame(coverage_results)
-    coverage_df.to_csv(output_dir / "data_coverage_analysis.csv", index=False)
-
     print(f"\nDETAILED RESULTS SAVED TO {output_dir}:")
     print(
         f"  {output_dir}/relationship_analysis.csv - Foreign key relationship metrics"
@@ -317,13 +442,13 @@ def main():
         fk_results = analyze_foreign_keys(datasets)
 
         print(f"Analyzing data coverage...")
-        coverage_results = analyze_data_coverage(datasets)
+        coverage_results = analyze_data_coverage(datasets, output_dir)
 
         # Generate report
         generate_report(datasets, fk_results, coverage_results)
 
         # Save detailed results
-        save_detailed_results(fk_results, coverage_results, output_dir)
+        save_detailed_results(fk_results, output_dir)
 
     except Exception as e:
         print(f"ERROR: {e}")
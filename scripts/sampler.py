@@ -1,6 +1,7 @@
 import os
 import pandas as pd
 import shutil
+from itertools import islice
 from pathlib import Path
 
 # Clear and create samples directory
@@ -14,14 +15,22 @@ datasets_dir = Path("../private/data/raw")
 csv_files = list(datasets_dir.glob("*.csv"))
 
 for csv_file in csv_files:
-    # Read the CSV with dtype=str to avoid warnings and speed up
-    df = pd.read_csv(csv_file, dtype=str, low_memory=False)
+    # Count raw lines, stopping one past the limit: header + 500 lines can
+    # hold at most 500 rows, so those files are copied without parsing
+    with open(csv_file, "rb") as f:
+        small_file = sum(1 for _ in islice(f, 502)) <= 501
 
-    if len(df) <= 500:
+    if not small_file:
+        # Quoted fields may span lines, so read at most 501 rows with
+        # dtype=str to tell whether there really are more than 500
+        df = pd.read_csv(csv_file, dtype=str, nrows=501, low_memory=False)
+        small_file = len(df) <= 500
+
+    if small_file:
         # Copy entire file with copy_ prefix
         output_path = samples_dir / f"copy_{csv_file.name}"
-        df.to_csv(output_path, index=False)
+        shutil.copyfile(csv_file, output_path)
     else:
         # Take first 500 rows with sample_ prefix
         output_path = samples_dir / f"sample_{csv_file.name}"
-        df.head(500).to_csv(output_path, index=False)
\ No newline at end of file
+        df.head(500).to_csv(output_path, index=False)